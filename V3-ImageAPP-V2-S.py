@@ -1,15 +1,360 @@
 import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import cv2
+import dlib
 import face_recognition
 import numpy as np
 import pandas as pd
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, 
     QFileDialog, QTableWidget, QTableWidgetItem, QHeaderView
 )
 from datetime import datetime
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import simsimd
+    HAS_SIMSIMD = True
+except ImportError:
+    HAS_SIMSIMD = False
+
+# Reference image file extensions, in order of preference when a roll number has several
+REFERENCE_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Reference encodings are cached in this file inside the reference images folder
+ENCODING_CACHE_FILENAME = ".encodings_cache.npz"
+
+# Maximum distance between a detected face and a known face for them to match,
+# inclusive like face_recognition.compare_faces (lower is stricter)
+MATCH_TOLERANCE = 0.5
+
+# Below this many known faces the fused Numba kernel beats NumPy's matrix multiply
+NUMBA_MAX_KNOWN = 50
+
+# Detected faces the reusable distance buffer holds before it has to grow
+DIST_BUFFER_ROWS = 64
+
+# Use the GPU-accelerated CNN face detector when dlib was built with CUDA support and a GPU is present
+# (rebuild dlib with -DDLIB_USE_CUDA=1 and cuDNN installed to enable it)
+USE_CUDA = bool(dlib.DLIB_USE_CUDA) and dlib.cuda.get_num_devices() > 0
+DETECTION_MODEL = "cnn" if USE_CUDA else "hog"
+
+# Number of reference images decoded and sent to the GPU detector at once
+GPU_BATCH_SIZE = 32
+
+# Group images are downscaled so their longest side is at most this many pixels before face detection
+MAX_DETECTION_SIDE = 1000
+
+# Reference images are encoded in worker processes only when at least this many need encoding,
+# since every spawned worker re-imports this script and loads its own copy of the dlib models
+MIN_PARALLEL_IMAGES = 4
+MAX_ENCODE_WORKERS = 4
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _nearest_known(detected, known, threshold):
+        """Return the index of the closest known face for each detected face, or -1 if none is within threshold."""
+        out = np.full(detected.shape[0], -1, np.int64)
+        for i in prange(detected.shape[0]):
+            best = 1e18
+            best_index = -1
+            for j in range(known.shape[0]):
+                s = 0.0
+                for k in range(detected.shape[1]):
+                    d = detected[i, k] - known[j, k]
+                    s += d * d
+                if s < best:
+                    best = s
+                    best_index = j
+            if best <= threshold * threshold:
+                out[i] = best_index
+        return out
+
+
+def load_encoding_cache(cache_path):
+    """Read cached reference encodings as {roll_number: (file_name, mtime, size, encoding)}.
+
+    The encoding is None for images in which no face was found.
+    """
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with np.load(cache_path) as data:
+            return {
+                str(roll): (str(name), float(mtime), int(size), None if np.isnan(enc).any() else enc.astype(np.float32))
+                for roll, name, mtime, size, enc in zip(
+                    data["rolls"], data["names"], data["mtimes"], data["sizes"], data["encs"]
+                )
+            }
+    except Exception:
+        return {}  # Unreadable or stale cache format; re-encode everything
+
+
+def save_encoding_cache(cache_path, cache):
+    """Write {roll_number: (file_name, mtime, size, encoding)} to the cache file, storing a None encoding as NaNs."""
+    rolls = list(cache)
+    no_face = np.full(128, np.nan)
+    try:
+        np.savez(
+            cache_path,
+            rolls=np.array(rolls, dtype=str),
+            names=np.array([cache[r][0] for r in rolls], dtype=str),
+            mtimes=np.array([cache[r][1] for r in rolls], dtype=np.float64),
+            sizes=np.array([cache[r][2] for r in rolls], dtype=np.int64),
+            encs=np.array(
+                [no_face if cache[r][3] is None else cache[r][3] for r in rolls], dtype=np.float32
+            ).reshape(-1, 128),
+        )
+    except OSError:
+        pass  # Read-only folder; encodings are simply recomputed next time
+
+
+def _downscale_for_detection(image):
+    """Return (image shrunk so its longest side is at most MAX_DETECTION_SIDE, scale factor k)."""
+    h, w = image.shape[:2]
+    if max(h, w) <= MAX_DETECTION_SIDE:
+        return image, 1.0
+    k = MAX_DETECTION_SIDE / max(h, w)
+    return cv2.resize(image, None, fx=k, fy=k, interpolation=cv2.INTER_AREA), k
+
+
+def _scale_locations(locations, k):
+    """Map face boxes found on an image downscaled by k back to the original image."""
+    return [
+        (int(top / k), int(right / k), int(bottom / k), int(left / k))
+        for top, right, bottom, left in locations
+    ]
+
+
+def _load_rgb(image_path):
+    """Decode an image file with OpenCV as an RGB array, or return None if it cannot be read."""
+    bgr = cv2.imread(image_path)
+    if bgr is None:
+        return None
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+
+
+def _encode(image_path):
+    """Return the first face encoding found in an image file, or None.
+
+    Defined at module level so it can be dispatched to worker processes.
+    """
+    image = _load_rgb(image_path)
+    if image is None:
+        return None
+
+    # Reference photos are close-ups, so try detection without upsampling first
+    locations = face_recognition.face_locations(image, number_of_times_to_upsample=0)
+    if not locations:
+        locations = face_recognition.face_locations(image)
+    if not locations:
+        return None
+    return face_recognition.face_encodings(image, locations[:1])[0]
+
+
+def _encode_batch(image_paths):
+    """Return the first face encoding of each image file (or None), detecting faces in GPU batches."""
+    encodings = []
+    # Decode only GPU_BATCH_SIZE images at a time to bound host and GPU memory
+    for start in range(0, len(image_paths), GPU_BATCH_SIZE):
+        images = [_load_rgb(path) for path in image_paths[start:start + GPU_BATCH_SIZE]]
+        smalls = [_downscale_for_detection(image) if image is not None else None for image in images]
+
+        # batch_face_locations needs equally sized images, so batch per downscaled shape
+        by_shape = {}
+        for i, small in enumerate(smalls):
+            if small is not None:
+                by_shape.setdefault(small[0].shape, []).append(i)
+
+        batch_encodings = [None] * len(images)
+        for indices in by_shape.values():
+            batch_locations = face_recognition.batch_face_locations(
+                [smalls[i][0] for i in indices], number_of_times_to_upsample=0, batch_size=GPU_BATCH_SIZE
+            )
+            for i, locations in zip(indices, batch_locations):
+                if not locations:
+                    # Retry with the default upsampling for unusually small faces
+                    locations = face_recognition.face_locations(smalls[i][0], model="cnn")
+                if locations:
+                    # Encode on the full-resolution image
+                    batch_encodings[i] = face_recognition.face_encodings(
+                        images[i], _scale_locations(locations[:1], smalls[i][1])
+                    )[0]
+        encodings.extend(batch_encodings)
+    return encodings
+
+
+def encode_reference_images(folder_path, roll_numbers, progress):
+    """Encode the reference image of each roll number found in folder_path.
+
+    progress(resolved, total, message) is called each time a roll number is
+    resolved (missing, cached or encoded). Returns the roll numbers that have
+    a face and their float32 encodings, in roster order.
+    """
+    # Reuse encodings of images that have not changed since the last load
+    cache_path = os.path.join(folder_path, ENCODING_CACHE_FILENAME)
+    cache = load_encoding_cache(cache_path)
+
+    # Scan the folder once for images named after roll numbers (e.g., 1001.jpg)
+    # Support multiple extensions, preferring them in REFERENCE_IMAGE_EXTENSIONS order
+    entries = {}  # file stem -> (extension priority, DirEntry)
+    file_names = set()
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext in REFERENCE_IMAGE_EXTENSIONS and entry.is_file():
+                file_names.add(entry.name)
+                priority = REFERENCE_IMAGE_EXTENSIONS.index(ext)
+                if stem not in entries or priority < entries[stem][0]:
+                    entries[stem] = (priority, entry)
+
+    # Keep entries of other rosters sharing this folder; only drop those whose image is gone
+    new_cache = {roll: cached for roll, cached in cache.items() if cached[0] in file_names}
+    cache_changed = len(new_cache) != len(cache)
+
+    image_paths = {}  # roll_number -> (image_path, cache key)
+    encodings = {}  # roll_number -> encoding or None if no face was found
+    resolved = 0
+
+    def resolve(roll_number, encoding):
+        nonlocal resolved
+        resolved += 1
+        encodings[roll_number] = encoding
+        if encoding is not None:
+            message = f"Loaded encoding for Roll Number: {roll_number}"
+        else:
+            message = f"No face found in image: {image_paths[roll_number][0]}"
+        progress(resolved, len(roll_numbers), message)
+
+    # Collect the image for each roll number, resolving cached ones straight away
+    pending = []
+    for roll_number in roll_numbers:
+        if roll_number not in entries:
+            resolved += 1
+            progress(resolved, len(roll_numbers), f"No image found for Roll Number: {roll_number}")
+            continue
+        entry = entries[roll_number][1]
+        st = entry.stat()
+        key = (entry.name, st.st_mtime, st.st_size)
+        image_paths[roll_number] = (entry.path, key)
+        cached = cache.get(roll_number)
+        if cached is not None and cached[:3] == key:
+            resolve(roll_number, cached[3])
+        else:
+            pending.append(roll_number)
+
+    # Encode the remaining images, in parallel when there are enough to pay for starting workers
+    paths = [image_paths[roll][0] for roll in pending]
+    if USE_CUDA:
+        # The GPU is shared, so detect in batches from this process instead of spawning workers
+        results = _encode_batch(paths)
+        for roll_number, encoding in zip(pending, results):
+            resolve(roll_number, encoding)
+    elif len(paths) < MIN_PARALLEL_IMAGES:
+        for roll_number, path in zip(pending, paths):
+            resolve(roll_number, _encode(path))
+    else:
+        # Spawn rather than fork: this runs on a Qt worker thread, and forking a multithreaded process can deadlock
+        with ProcessPoolExecutor(
+            max_workers=min(MAX_ENCODE_WORKERS, os.cpu_count() or 1, len(paths)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            for roll_number, encoding in zip(pending, executor.map(_encode, paths)):
+                resolve(roll_number, encoding)
+
+    for roll_number in pending:
+        new_cache[roll_number] = image_paths[roll_number][1] + (encodings[roll_number],)  # Also remembers images without a face
+    if cache_changed or pending:
+        save_encoding_cache(cache_path, new_cache)
+
+    known_roll_numbers = []
+    known_encodings = []
+    for roll_number in image_paths:
+        if encodings[roll_number] is not None:
+            known_roll_numbers.append(roll_number)
+            known_encodings.append(encodings[roll_number].astype(np.float32))
+    return known_roll_numbers, known_encodings
+
+
+def detect_face_encodings(file_path):
+    """Detect the faces in a group image and return their encodings, or None if it cannot be read."""
+    image = cv2.imread(file_path)
+    if image is None:
+        return None
+
+    rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    # The HOG detector ignores color, so detect on a single-channel copy; the CNN detector needs RGB
+    detect_image = rgb_image if USE_CUDA else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # Detect faces on a downscaled copy, since detector cost grows with pixel count
+    small, k = _downscale_for_detection(detect_image)
+    small_locations = face_recognition.face_locations(small, model=DETECTION_MODEL)
+
+    # Scale the boxes back up and encode on the full-resolution image
+    face_locations = _scale_locations(small_locations, k)
+    return face_recognition.face_encodings(rgb_image, face_locations)
+
+
+class EncodeJob(QRunnable):
+    """Encode a folder of reference images on a QThreadPool thread."""
+
+    class Signals(QObject):
+        progress = pyqtSignal(int, int, str)  # Roll numbers resolved, total roll numbers, status message
+        done = pyqtSignal(list, list)  # Roll numbers, encodings
+        error = pyqtSignal(str)
+
+    def __init__(self, folder_path, roll_numbers):
+        super().__init__()
+        self.folder_path = folder_path
+        self.roll_numbers = roll_numbers
+        self.signals = EncodeJob.Signals()
+
+    def run(self):
+        try:
+            roll_numbers, encodings = encode_reference_images(
+                self.folder_path, self.roll_numbers, self.signals.progress.emit
+            )
+        except Exception as e:
+            self.signals.error.emit(f"Error loading reference images: {str(e)}")
+            return
+        self.signals.done.emit(roll_numbers, encodings)
+
+
+class DetectJob(QRunnable):
+    """Detect and encode the faces in a group image on a QThreadPool thread."""
+
+    class Signals(QObject):
+        done = pyqtSignal(list)  # Detected face encodings
+        error = pyqtSignal(str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = DetectJob.Signals()
+
+    def run(self):
+        try:
+            encodings = detect_face_encodings(self.file_path)
+        except Exception as e:
+            self.signals.error.emit(f"Error processing image: {str(e)}")
+            return
+        if encodings is None:
+            self.signals.error.emit("Failed to load image.")
+            return
+        self.signals.done.emit(list(encodings))
+
+
 class AttendanceApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -48,6 +393,7 @@ class AttendanceApp(QWidget):
         self.table.setColumnCount(2)
         self.table.setHorizontalHeaderLabels(["Roll Number", "Attendance"])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.itemChanged.connect(self.on_table_item_changed)
         self.layout.addWidget(self.table)
 
         # Button to save attendance
@@ -57,9 +403,22 @@ class AttendanceApp(QWidget):
 
         # Data structures to hold roll numbers and face encodings
         self.roll_numbers = []  # List of roll numbers
-        self.known_face_encodings = []  # Store known face encodings
+        self.known_face_encodings = []  # Store known face encodings (float32)
         self.known_face_roll_numbers = []  # Map face encodings to roll numbers
+        self.known_matrix = np.empty((0, 128), dtype=np.float32)  # Known encodings stacked as (N, 128)
+        self._known_sq = np.empty(0, dtype=np.float32)  # Squared norms of the rows of known_matrix
+        self._known_T = np.empty((128, 0), dtype=np.float32)  # Contiguous transpose of known_matrix
+        self._known_roll_arr = np.empty(0, dtype=object)  # known_face_roll_numbers as an array for masked lookup
+        self._dist_buf = np.empty((0, 0), dtype=np.float32)  # Reused (detected, known) distance matrix
         self.group_face_encodings = []  # Detected faces in group image
+        self._roll_to_row = {}  # Roll number -> list of table rows
+        self._current_status = []  # Attendance text shown in the table, one entry per row
+        self._encode_job = None  # Most recent EncodeJob
+        self._detect_job = None  # Most recent DetectJob
+
+        # Pay the Numba JIT compile cost once at startup rather than on the first match
+        if HAS_NUMBA:
+            _nearest_known(np.zeros((1, 128), np.float32), np.zeros((1, 128), np.float32), MATCH_TOLERANCE)
 
     def load_roll_numbers(self):
         """Load the CSV file containing roll numbers."""
@@ -76,46 +435,58 @@ class AttendanceApp(QWidget):
                 self.status_label.setText(f"Loaded {len(self.roll_numbers)} roll numbers.")
 
                 # Populate the table with roll numbers and default attendance as "A"
-                self.table.setRowCount(0)
-                for roll_number in self.roll_numbers:
-                    row_position = self.table.rowCount()
-                    self.table.insertRow(row_position)
-                    self.table.setItem(row_position, 0, QTableWidgetItem(roll_number))
-                    self.table.setItem(row_position, 1, QTableWidgetItem("A"))  # Default to Absent
+                self._roll_to_row = self.map_roll_numbers_to_rows()
+                self._current_status = ["A"] * len(self.roll_numbers)
+                self.table.setUpdatesEnabled(False)
+                self.table.blockSignals(True)
+                try:
+                    self.table.setRowCount(0)
+                    self.table.setRowCount(len(self.roll_numbers))
+                    for row, roll_number in enumerate(self.roll_numbers):
+                        self.table.setItem(row, 0, QTableWidgetItem(roll_number))
+                        self.table.setItem(row, 1, QTableWidgetItem("A"))  # Default to Absent
+                finally:
+                    self.table.blockSignals(False)
+                    self.table.setUpdatesEnabled(True)
 
             except Exception as e:
                 self.status_label.setText(f"Error loading CSV: {str(e)}")
 
     def load_reference_images(self):
-        """Load reference images from a folder and extract face encodings."""
+        """Load reference images from a folder and extract face encodings in the background."""
         folder_path = QFileDialog.getExistingDirectory(self, "Select Reference Images Folder")
         if folder_path:
-            self.known_face_encodings = []
-            self.known_face_roll_numbers = []
-
-            loaded_count = 0
-            for roll_number in self.roll_numbers:
-                # Attempt to find image with roll number as filename (e.g., 1001.jpg)
-                # Support multiple extensions
-                found = False
-                for ext in ['.jpg', '.jpeg', '.png']:
-                    image_path = os.path.join(folder_path, f"{roll_number}{ext}")
-                    if os.path.exists(image_path):
-                        image = face_recognition.load_image_file(image_path)
-                        encodings = face_recognition.face_encodings(image)
-                        if encodings:
-                            self.known_face_encodings.append(encodings[0])
-                            self.known_face_roll_numbers.append(roll_number)
-                            loaded_count += 1
-                            self.status_label.setText(f"Loaded encoding for Roll Number: {roll_number}")
-                        else:
-                            self.status_label.setText(f"No face found in image: {image_path}")
-                        found = True
-                        break  # Stop searching extensions once found
-                if not found:
-                    self.status_label.setText(f"No image found for Roll Number: {roll_number}")
-
-            self.status_label.setText(f"Loaded {loaded_count} face encodings from reference images.")
+            self.set_busy(True)
+
+            # Keep a reference to the job so its signals outlive the call
+            self._encode_job = EncodeJob(folder_path, list(self.roll_numbers))
+            self._encode_job.signals.progress.connect(self.on_encode_progress)
+            self._encode_job.signals.done.connect(self.on_reference_images_loaded)
+            self._encode_job.signals.error.connect(self.on_job_error)
+            QThreadPool.globalInstance().start(self._encode_job)
+
+    def on_encode_progress(self, resolved, total, message):
+        """Show EncodeJob progress as the latest message and roll numbers resolved so far."""
+        self.status_label.setText(f"{message} ({resolved}/{total})")
+
+    def on_reference_images_loaded(self, roll_numbers, encodings):
+        """Store the encodings produced by EncodeJob."""
+        self.known_face_roll_numbers = roll_numbers
+        self.known_face_encodings = encodings
+
+        # Stack encodings once so matching is a single vectorized pass
+        # float32 halves memory traffic and lets BLAS use SGEMM; the encodings don't need double precision
+        if self.known_face_encodings:
+            self.known_matrix = np.ascontiguousarray(np.stack(self.known_face_encodings), dtype=np.float32)
+        else:
+            self.known_matrix = np.empty((0, 128), dtype=np.float32)
+        self._known_sq = (self.known_matrix ** 2).sum(axis=1)
+        self._known_roll_arr = np.array(self.known_face_roll_numbers, dtype=object)
+        self._known_T = np.ascontiguousarray(self.known_matrix.T)
+        self._dist_buf = np.empty((DIST_BUFFER_ROWS, self.known_matrix.shape[0]), dtype=np.float32)
+
+        self.set_busy(False)
+        self.status_label.setText(f"Loaded {len(encodings)} face encodings from reference images.")
 
     def load_image(self):
         """Load an image containing a group of students' faces."""
@@ -126,17 +497,19 @@ class AttendanceApp(QWidget):
             self.process_image(file_path)
 
     def process_image(self, file_path):
-        """Process the group image to detect and recognize faces."""
-        image = cv2.imread(file_path)
-        if image is None:
-            self.status_label.setText("Failed to load image.")
-            return
+        """Process the group image to detect and recognize faces in the background."""
+        self.set_busy(True)
+        self.status_label.setText("Detecting faces in the group image...")
 
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Keep a reference to the job so its signals outlive the call
+        self._detect_job = DetectJob(file_path)
+        self._detect_job.signals.done.connect(self.on_group_image_processed)
+        self._detect_job.signals.error.connect(self.on_job_error)
+        QThreadPool.globalInstance().start(self._detect_job)
 
-        # Detect faces and get their encodings
-        face_locations = face_recognition.face_locations(rgb_image)
-        detected_face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
+    def on_group_image_processed(self, detected_face_encodings):
+        """Match the faces found by DetectJob and mark attendance."""
+        self.set_busy(False)
 
         if len(detected_face_encodings) == 0:
             self.status_label.setText("No faces detected in the image.")
@@ -145,32 +518,23 @@ class AttendanceApp(QWidget):
         self.group_face_encodings = detected_face_encodings  # Store for update
 
         # Match detected faces with known encodings
-        present_roll_numbers = set()
-        for detected_encoding in detected_face_encodings:
-            matches = face_recognition.compare_faces(
-                self.known_face_encodings, detected_encoding, tolerance=0.5
-            )  # Lower tolerance for stricter matching
-            face_distances = face_recognition.face_distance(
-                self.known_face_encodings, detected_encoding
-            )
-            best_match_index = np.argmin(face_distances) if len(face_distances) > 0 else -1
-            if best_match_index != -1 and matches[best_match_index]:
-                matched_roll_number = self.known_face_roll_numbers[best_match_index]
-                present_roll_numbers.add(matched_roll_number)
-                self.status_label.setText(f"Detected and matched Roll Number: {matched_roll_number}")
-            else:
-                self.status_label.setText("A detected face did not match any known roll numbers.")
+        present_roll_numbers = self.match_faces(detected_face_encodings)
 
         # Automatically mark attendance
-        for row in range(self.table.rowCount()):
-            roll_number = self.table.item(row, 0).text()
-            if roll_number in present_roll_numbers:
-                self.table.setItem(row, 1, QTableWidgetItem("P"))  # Mark Present
-            else:
-                self.table.setItem(row, 1, QTableWidgetItem("A"))  # Mark Absent
+        self.mark_attendance(present_roll_numbers)
 
         self.status_label.setText(f"Processed image. Detected {len(detected_face_encodings)} face(s).")
 
+    def on_job_error(self, message):
+        """Report a failed background job and re-enable the buttons."""
+        self.set_busy(False)
+        self.status_label.setText(message)
+
+    def set_busy(self, busy):
+        """Disable the buttons that start or depend on background work while a job runs."""
+        for button in (self.roll_button, self.image_folder_button, self.image_button, self.update_button):
+            button.setEnabled(not busy)
+
     def update_attendance(self):
         """Update the attendance based on previously loaded group image."""
         if not self.group_face_encodings:
@@ -178,32 +542,87 @@ class AttendanceApp(QWidget):
             return
 
         # Match detected faces with known encodings
-        present_roll_numbers = set()
-        for detected_encoding in self.group_face_encodings:
-            matches = face_recognition.compare_faces(
-                self.known_face_encodings, detected_encoding, tolerance=0.5
-            )  # Adjust tolerance as needed
-            face_distances = face_recognition.face_distance(
-                self.known_face_encodings, detected_encoding
-            )
-            best_match_index = np.argmin(face_distances) if len(face_distances) > 0 else -1
-            if best_match_index != -1 and matches[best_match_index]:
-                matched_roll_number = self.known_face_roll_numbers[best_match_index]
-                present_roll_numbers.add(matched_roll_number)
-                self.status_label.setText(f"Updated and marked Present: {matched_roll_number}")
-            else:
-                self.status_label.setText("A detected face did not match any known roll numbers.")
+        present_roll_numbers = self.match_faces(self.group_face_encodings)
 
         # Automatically mark attendance
-        for row in range(self.table.rowCount()):
-            roll_number = self.table.item(row, 0).text()
-            if roll_number in present_roll_numbers:
-                self.table.setItem(row, 1, QTableWidgetItem("P"))  # Mark Present
-            else:
-                self.table.setItem(row, 1, QTableWidgetItem("A"))  # Mark Absent
+        self.mark_attendance(present_roll_numbers)
 
         self.status_label.setText(f"Attendance updated based on processed group image.")
 
+    def mark_attendance(self, present_roll_numbers):
+        """Mark present roll numbers "P" and all others "A", repainting only the cells that change."""
+        present_rows = {row for r in present_roll_numbers for row in self._roll_to_row.get(r, ())}
+
+        # Only cells whose text differs from the new status need a new item
+        changes = [(row, "P") for row in present_rows if self._current_status[row] != "P"]
+        changes += [
+            (row, "A") for row, status in enumerate(self._current_status)
+            if status != "A" and row not in present_rows
+        ]
+        if not changes:
+            return
+
+        self.table.setUpdatesEnabled(False)
+        self.table.blockSignals(True)
+        try:
+            for row, status in changes:
+                self.table.setItem(row, 1, QTableWidgetItem(status))
+                self._current_status[row] = status
+        finally:
+            self.table.blockSignals(False)
+            self.table.setUpdatesEnabled(True)
+
+    def map_roll_numbers_to_rows(self):
+        """Return {roll_number: [rows]}; a roll number listed more than once maps to every row."""
+        roll_to_row = {}
+        for row, roll_number in enumerate(self.roll_numbers):
+            roll_to_row.setdefault(roll_number, []).append(row)
+        return roll_to_row
+
+    def on_table_item_changed(self, item):
+        """Keep roll numbers and attendance in sync with manual edits in the table."""
+        row = item.row()
+        if row >= len(self.roll_numbers):
+            return
+        if item.column() == 0:
+            self.roll_numbers[row] = item.text()
+            self._roll_to_row = self.map_roll_numbers_to_rows()
+        elif item.column() == 1:
+            self._current_status[row] = item.text()
+
+    def match_faces(self, detected_face_encodings):
+        """Return the roll numbers whose known encoding best matches a detected face."""
+        if len(detected_face_encodings) == 0 or self.known_matrix.shape[0] == 0:
+            return set()
+
+        detected = np.asarray(detected_face_encodings, dtype=np.float32)
+
+        # For small classes a single fused loop avoids NumPy's temporaries
+        if HAS_NUMBA and self.known_matrix.shape[0] < NUMBA_MAX_KNOWN:
+            best = _nearest_known(detected, self.known_matrix, MATCH_TOLERANCE)
+            return set(self._known_roll_arr[best[best >= 0]].tolist())
+
+        if HAS_SIMSIMD:
+            # SimSIMD's hand-vectorized kernels
+            d2 = np.asarray(simsimd.cdist(detected, self.known_matrix, metric="sqeuclidean"))
+        else:
+            # Squared distances from every detected face to every known face as |a|^2 + |b|^2 - 2*a.b,
+            # i.e. one matrix multiply instead of an (M, N, 128) difference tensor, shape (M, N).
+            # The terms are accumulated into the GEMM result, written into a buffer that is reused
+            # across calls and only grows for larger groups, so no (M, N) array is allocated per call
+            if len(detected) > self._dist_buf.shape[0]:
+                self._dist_buf = np.empty((len(detected), self.known_matrix.shape[0]), dtype=np.float32)
+            d2 = self._dist_buf[:len(detected)]
+            np.matmul(detected, self._known_T, out=d2)
+            d2 *= -2.0
+            d2 += np.einsum('ij,ij->i', detected, detected)[:, None]
+            d2 += self._known_sq[None, :]
+            np.maximum(d2, 0, out=d2)  # Clamp rounding error below zero
+
+        best = d2.argmin(axis=1)
+        mask = d2[np.arange(len(detected)), best] <= MATCH_TOLERANCE ** 2
+        return set(self._known_roll_arr[best[mask]].tolist())
+
     def save_attendance(self):
         """Save the attendance to a CSV file."""
         if len(self.roll_numbers) == 0:
@@ -213,16 +632,11 @@ class AttendanceApp(QWidget):
         selected_date = datetime.now().strftime("%Y-%m-%d")
         new_filename = f"attendance_{selected_date}.csv"
 
-        # Prepare attendance data
-        attendance_data = []
-        for row in range(self.table.rowCount()):
-            roll_number = self.table.item(row, 0).text()
-            attendance_status = self.table.item(row, 1).text()
-            attendance_data.append([roll_number, attendance_status])
-
-        # Save attendance data to CSV
+        # Save attendance data to CSV straight from the in-memory state, without reading the table
         try:
-            pd.DataFrame(attendance_data, columns=["Roll Number", "Attendance"]).to_csv(new_filename, index=False)
+            pd.DataFrame(
+                {"Roll Number": self.roll_numbers, "Attendance": self._current_status}
+            ).to_csv(new_filename, index=False)
             self.status_label.setText(f"Attendance saved to {new_filename}")
         except Exception as e:
             self.status_label.setText(f"Error saving attendance: {str(e)}")